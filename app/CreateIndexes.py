@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from neo4j import GraphDatabase
 import time
 
@@ -5,30 +6,110 @@ import time
 NEO4J_URI = "neo4j://localhost:7687"
 USERNAME = "neo4j"
 PASSWORD = "password"
+DATABASE = "neo4j"
 
-driver = GraphDatabase.driver(NEO4J_URI, auth=(USERNAME, PASSWORD))
+driver = GraphDatabase.driver(
+    NEO4J_URI,
+    auth=(USERNAME, PASSWORD),
+    max_connection_pool_size=64,
+    connection_acquisition_timeout=120,
+    max_connection_lifetime=3600,
+)
+
+
+def _run_schema(session, query):
+    """
+    Runs a schema statement in a managed write transaction, so transient
+    errors (e.g. concurrent schema changes on the same label) are retried.
+    :param session: open Neo4j session
+    :param query: Cypher schema statement
+    :return: result summary
+    """
+    return session.execute_write(lambda tx: tx.run(query).consume())
+
+
+def _drop_index(session, index_name):
+    """
+    Drops an index if it exists and reports whether anything was removed.
+    :param session: open Neo4j session
+    :param index_name: name of the index to drop
+    """
+    summary = _run_schema(session, f"DROP INDEX {index_name} IF EXISTS")
+    if summary.counters.indexes_removed:
+        print(f"✓ Dropped {index_name}")
+    else:
+        print(f"✓ {index_name} already absent")
+
+
+def _submit(index_item):
+    """
+    Runs a single CREATE INDEX statement in its own session.
+    :param index_item: (index_name, index_query) tuple
+    :return: (index_name, execution_time, error)
+    """
+    index_name, index_query = index_item
+    with driver.session(database=DATABASE) as session:
+        try:
+            start_time = time.perf_counter()
+            _run_schema(session, index_query)
+            end_time = time.perf_counter()
+            return index_name, end_time - start_time, None
+        except Exception as e:
+            return index_name, None, e
+
+
+def _replace_index_with_constraint(session, constraint_item):
+    """
+    Swaps a plain composite index for a unique constraint on the same properties.
+    Neo4j refuses to create the constraint while the equivalent index exists, so
+    the index is dropped first and recreated if the constraint cannot be created.
+    :param session: open Neo4j session
+    :param constraint_item: (constraint_name, (constraint_query, legacy_name, legacy_query)) tuple
+    """
+    constraint_name, (constraint_query, legacy_name, legacy_query) = constraint_item
+    _drop_index(session, legacy_name)
+    try:
+        start_time = time.perf_counter()
+        _run_schema(session, constraint_query)
+        end_time = time.perf_counter()
+        print(f"✓ Created {constraint_name} ({end_time - start_time:.3f}s)")
+    except Exception as e:
+        message = f"Could not create {constraint_name}: {str(e)}"
+        try:
+            _run_schema(session, legacy_query)
+            print(f"✗ Failed to create {constraint_name}, restored {legacy_name}")
+        except Exception as restore_error:
+            print(f"✗ Failed to create {constraint_name} and to restore {legacy_name}")
+            message += (
+                f" (restoring {legacy_name} also failed, so it is now missing:"
+                f" {str(restore_error)})"
+            )
+        raise RuntimeError(message) from e
 
 
 def create_indexes():
     """
-    Creates all necessary indexes for optimal query performance.
-    Uses composite indexes with prefix matching to minimize total index count.
+    Creates all necessary indexes and constraints for optimal query performance.
+    Symbol lookups by fq_name go through a unique constraint; everything else
+    uses composite indexes with prefix matching to minimize total index count.
     """
 
-    indexes = {
-        # ============================================
-        # SYMBOL NODE INDEXES (4 total)
-        # ============================================
-        "idx_symbol_calls_lookup": """
+    # Unique constraints and the plain composite index each one replaces:
+    # name -> (constraint_query, legacy_index_name, legacy_index_query)
+    constraints = {
+        "symbol_fqname_unique": ("""
+            CREATE CONSTRAINT symbol_fqname_unique IF NOT EXISTS
+            FOR (s:Symbol) REQUIRE (s.repository_url, s.type, s.fq_name) IS UNIQUE
+        """, "idx_symbol_calls_lookup", """
             CREATE INDEX idx_symbol_calls_lookup IF NOT EXISTS
             FOR (s:Symbol) ON (s.repository_url, s.type, s.fq_name)
-        """,
-
-        "idx_symbol_type_lookup": """
-            CREATE INDEX idx_symbol_type_lookup IF NOT EXISTS
-            FOR (s:Symbol) ON (s.repository_url, s.type, s.fq_name, s.file_path)
-        """,
+        """)
+    }
 
+    indexes = {
+        # ============================================
+        # SYMBOL NODE INDEXES (2 total, plus symbol_fqname_unique)
+        # ============================================
         "idx_symbol_file_path": """
             CREATE INDEX idx_symbol_file_path IF NOT EXISTS
             FOR (s:Symbol) ON (s.repository_url, s.file_path)
@@ -66,24 +147,35 @@ def create_indexes():
 
     print("Creating indexes for optimal query performance...\n")
 
-    with driver.session() as session:
-        for index_name, index_query in indexes.items():
-            try:
-                start_time = time.perf_counter()
-                session.run(index_query)
-                end_time = time.perf_counter()
-                execution_time = end_time - start_time
+    # CREATE INDEX returns before population finishes, so submitting the plain
+    # indexes concurrently overlaps their round-trips. Constraints populate and
+    # validate their backing index synchronously and run sequentially below.
+    with ThreadPoolExecutor(max_workers=len(indexes)) as executor:
+        for index_name, execution_time, error in executor.map(_submit, indexes.items()):
+            if error is None:
                 print(f"✓ Created {index_name} ({execution_time:.3f}s)")
-            except Exception as e:
-                print(f"✗ Failed to create {index_name}: {str(e)}")
+            else:
+                print(f"✗ Failed to create {index_name}: {str(error)}")
+
+    with driver.session(database=DATABASE) as session:
+        # Constraints go one at a time: a failure restores the legacy index
+        # and aborts, so the CALLS lookup is never left without an index
+        for constraint_item in constraints.items():
+            _replace_index_with_constraint(session, constraint_item)
+
+        # DEFINED_IN_TYPE's lookup is served by the symbol_fqname_unique prefix
+        _drop_index(session, "idx_symbol_type_lookup")
+
+        session.run("CALL db.awaitIndexes()").consume()
 
-    print("\n" + "="*60)
-    print("Verifying created indexes...")
-    print("="*60 + "\n")
+        print("\n" + "="*60)
+        print("Verifying created indexes...")
+        print("="*60 + "\n")
 
-    # Show all indexes
-    with driver.session() as session:
-        result = session.run("SHOW INDEXES")
+        # Show all indexes
+        result = session.run(
+            "SHOW INDEXES YIELD name, type, labelsOrTypes, properties, state"
+        )
         for record in result:
             print(f"Index: {record['name']}")
             print(f"  Type: {record['type']}")
@@ -99,5 +191,6 @@ if __name__ == "__main__":
         print("✓ Index creation completed successfully!")
     except Exception as e:
         print(f"✗ Error: {str(e)}")
+        raise SystemExit(1)
     finally:
         driver.close()
@@ -5,8 +5,20 @@ import time
 NEO4J_URI = "neo4j://localhost:7687"  # Change to your Neo4j URI
 USERNAME = "neo4j"  # Your username
 PASSWORD = "password"  # Your password
+DATABASE = "neo4j"  # Target database
 
-driver = GraphDatabase.driver(NEO4J_URI, auth=(USERNAME, PASSWORD))
+# Query parameters
+REPOSITORY_URL = "https://github.com/igorserdyuchenko/source.git"
+BATCH_SIZE = 10000
+FILE_BATCH_SIZE = 100  # Rows are files, so smaller batches keep all workers busy
+
+driver = GraphDatabase.driver(
+    NEO4J_URI,
+    auth=(USERNAME, PASSWORD),
+    max_connection_pool_size=64,
+    connection_acquisition_timeout=120,
+    max_connection_lifetime=3600,
+)
 
 
 def run_query_with_timing(query, parameters=None):
@@ -16,7 +28,7 @@ def run_query_with_timing(query, parameters=None):
     :param parameters: Dictionary of query parameters (optional)
     :return: (execution_time, relationships_created)
     """
-    with driver.session() as session:
+    with driver.session(database=DATABASE) as session:
         start_time = time.perf_counter()
         summary = session.run(query, parameters or {}).consume()  # Consume to get summary
         end_time = time.perf_counter()
@@ -29,80 +41,93 @@ def run_query_with_timing(query, parameters=None):
 
 
 # Example usage
+# Only DEFINES_SYMBOL runs its batches concurrently: every file writes to its
+# own symbols, while the other queries MERGE onto shared end nodes (callees,
+# namespaces, types, files) and concurrent batches would deadlock on them.
 queries = {
     "DEFINED_IN_NAMESPACE": """
-        CALL (){
-            MATCH (m:Symbol {repository_url: "https://github.com/igorserdyuchenko/source.git"})
-            MATCH (t:Namespace {repository_url: "https://github.com/igorserdyuchenko/source.git"})
-            WHERE m.namespace = t.name
-              AND m.type IN ['TYPE', 'METHOD']
+        MATCH (m:Symbol {repository_url: $repo_url})
+        WHERE m.type IN ['TYPE', 'METHOD']
+        CALL (m) {
+            MATCH (t:Namespace {repository_url: $repo_url, name: m.namespace})
             MERGE (m)-[:DEFINED_IN_NAMESPACE_TEST]->(t)
-        } IN TRANSACTIONS OF 1000 ROWS""",
+        } IN TRANSACTIONS OF $batchSize ROWS""",
 
     "DEFINED_IN_TYPE": """
-        CALL (){
-            MATCH (m:Symbol {repository_url: "https://github.com/igorserdyuchenko/source.git", type: 'METHOD'})
-            WHERE m.defined_in_type IS NOT NULL
-            WITH apoc.convert.fromJsonList(m.defined_in_type) AS typeNameList, m
-            UNWIND typeNameList AS typeName
-            MATCH (t:Symbol {repository_url: "https://github.com/igorserdyuchenko/source.git", type: 'TYPE', fq_name: typeName, file_path: m.file_path})
+        MATCH (m:Symbol {repository_url: $repo_url, type: 'METHOD'})
+        WHERE m.defined_in_type IS NOT NULL
+        CALL (m) {
+            UNWIND CASE
+                WHEN m.defined_in_type IS :: STRING THEN apoc.convert.fromJsonList(m.defined_in_type)
+                ELSE m.defined_in_type
+            END AS typeName
+            MATCH (t:Symbol {repository_url: $repo_url, type: 'TYPE', fq_name: typeName, file_path: m.file_path})
             MERGE (m)-[:DEFINED_IN_TYPE_TEST]->(t)
-        } IN TRANSACTIONS OF 1000 ROWS""",
+        } IN TRANSACTIONS OF $batchSize ROWS""",
 
     "CALLS": """
         MATCH (s:Symbol {
             type: 'METHOD',
-            repository_url: "https://github.com/igorserdyuchenko/source.git"
+            repository_url: $repo_url
         })
         WHERE s.method_calls IS NOT NULL
           AND s.method_calls <> ''
           AND s.method_calls <> '[]'
           AND s.method_calls <> 'null'
         CALL (s) {
-            UNWIND apoc.convert.fromJsonList(s.method_calls) AS method_call
-            WITH s, method_call
+            UNWIND CASE
+                WHEN s.method_calls IS :: STRING THEN apoc.convert.fromJsonList(s.method_calls)
+                ELSE s.method_calls
+            END AS method_call
             MATCH (d:Symbol {
                 type: 'METHOD',
-                repository_url: "https://github.com/igorserdyuchenko/source.git",
+                repository_url: $repo_url,
                 fq_name: method_call
             })
             MERGE (s)-[:CALLS_TEST]->(d)
-        } IN TRANSACTIONS OF 1000 ROWS""",
+        } IN TRANSACTIONS OF $batchSize ROWS""",
 
     "DEFINES_SYMBOL": """
-        CALL () {
-            MATCH (file:File {repository_url: "https://github.com/igorserdyuchenko/source.git"})
-            MATCH (symbol:Symbol {repository_url: "https://github.com/igorserdyuchenko/source.git"})
-            WHERE symbol.file_path = file.path
+        MATCH (file:File {repository_url: $repo_url})
+        CALL (file) {
+            MATCH (symbol:Symbol {repository_url: $repo_url, file_path: file.path})
             MERGE (file)-[:DEFINES_SYMBOL_TEST]->(symbol)
-        } IN TRANSACTIONS OF 1000 ROWS""",
+        } IN 8 CONCURRENT TRANSACTIONS OF $fileBatchSize ROWS""",
 
     "INCLUDES_FILE": """
-        CALL (){
-            MATCH (repo:Repository {url: "https://github.com/igorserdyuchenko/source.git"})
-            MATCH (file:File {repository_url: "https://github.com/igorserdyuchenko/source.git"})
+        MATCH (repo:Repository {url: $repo_url})
+        MATCH (file:File {repository_url: $repo_url})
+        CALL (repo, file) {
             MERGE (repo)-[:INCLUDES_FILE_TEST]->(file)
-        } IN TRANSACTIONS OF 1000 ROWS""",
+        } IN TRANSACTIONS OF $batchSize ROWS""",
 
-    "IMPORTS_SYMBOL":"""
-            CALL (){
-            MATCH (file:File {repository_url: "https://github.com/igorserdyuchenko/source.git"})
+    "IMPORTS_SYMBOL": """
+        MATCH (file:File {repository_url: $repo_url})
+        CALL (file) {
             MATCH (file)-[:DEFINES_SYMBOL]->(caller:Symbol)
             MATCH (caller)-[:CALLS]->(callee:Symbol)
             WHERE file.path <> callee.file_path
             MERGE (file)-[:IMPORTS_SYMBOL_TEST]->(callee)
-            } IN TRANSACTIONS OF 1000 ROWS""",
-    "DEPENDS_ON_FILE":"""
-                CALL (){
-                MATCH (f1:File {repository_url: $repository_url})-[:IMPORTS_SYMBOL]->(s:Symbol)<-[:DEFINES_SYMBOL]-(f2:File)
-                WHERE f1.file_path <> f2.file_path
-                  AND f1.file_path <> s.file_path
-                MERGE (f1)-[:DEPENDS_ON_FILE_TEST]->(f2)
-                } IN TRANSACTIONS OF $batchSize ROWS"""
+        } IN TRANSACTIONS OF $batchSize ROWS""",
+
+    "DEPENDS_ON_FILE": """
+        MATCH (f1:File {repository_url: $repo_url})
+        CALL (f1) {
+            MATCH (f1)-[:IMPORTS_SYMBOL]->(s:Symbol)<-[:DEFINES_SYMBOL]-(f2:File)
+            WHERE f1.file_path <> f2.file_path
+              AND f1.file_path <> s.file_path
+            MERGE (f1)-[:DEPENDS_ON_FILE_TEST]->(f2)
+        } IN TRANSACTIONS OF $batchSize ROWS"""
+}
+
+parameters = {
+    "repo_url": REPOSITORY_URL,
+    "batchSize": BATCH_SIZE,
+    "fileBatchSize": FILE_BATCH_SIZE,
 }
 
 for key, q in queries.items():
-    exec_time, rel_created = run_query_with_timing(q)
+    exec_time, rel_created = run_query_with_timing(q, parameters)
     print(f"Query: {key}")
     print(f"Execution time: {exec_time:.4f} seconds")
     print(f"Relationships created: {rel_created}\n")